@@ -2,12 +2,15 @@ from fastapi import FastAPI, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from rag import ingest_pdf, ask_question, list_pdfs, delete_pdf, get_database_stats
+import aiofiles
+import asyncio
 import os
 from dotenv import load_dotenv
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -68,9 +71,18 @@ class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
 
+class HealthResponse(BaseModel):
+    status: str
+    message: str
+    version: str
+
+class DeleteResponse(BaseModel):
+    message: str
+    filename: str
+
 # ===== Endpoints =====
 
-@app.get("/")
+@app.get("/", response_model=HealthResponse)
 async def root():
     """Health check endpoint"""
     return {
@@ -103,34 +115,50 @@ async def upload_pdf(file: UploadFile):
                 detail="Only PDF files are allowed"
             )
         
-        # Validate file size (10MB limit)
-        contents = await file.read()
-        if not contents:
-            raise HTTPException(
-                status_code=400,
-                detail="Uploaded file is empty"
-            )
-        
-        file_size = len(contents)
-        max_size = 10 * 1024 * 1024  # 10MB
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size exceeds 10MB limit (got {file_size / 1024 / 1024:.2f}MB)"
-            )
-        
         # Ensure uploads directory exists
         os.makedirs("uploads", exist_ok=True)
-        
-        # Save file
+
+        # Stream to disk chunk-by-chunk instead of buffering the whole
+        # upload in RAM, enforcing the size cap as bytes arrive
+        max_size = 10 * 1024 * 1024  # 10MB
         file_path = f"uploads/{file.filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        
+        file_size = 0
+        try:
+            async with aiofiles.open(file_path, "wb") as f:
+                while chunk := await file.read(1 << 16):
+                    # Check the %PDF- signature on the first bytes so a
+                    # mistyped or malicious file is rejected before we
+                    # write it out and attempt a (slow) failed parse
+                    if file_size == 0 and not chunk.startswith(b"%PDF-"):
+                        raise HTTPException(
+                            status_code=400,
+                            detail="Not a valid PDF (missing %PDF- signature)"
+                        )
+                    file_size += len(chunk)
+                    if file_size > max_size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="File size exceeds 10MB limit"
+                        )
+                    await f.write(chunk)
+
+            if file_size == 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Uploaded file is empty"
+                )
+        except HTTPException:
+            # Don't leave a partial/empty file behind on rejection
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+
         logger.info(f"Saved file: {file.filename} ({file_size} bytes)")
         
-        # Process PDF
-        metadata = ingest_pdf(file_path)
+        # Process PDF in the threadpool so parsing/embedding doesn't
+        # block the event loop (and starve /ask) while it runs
+        loop = asyncio.get_running_loop()
+        metadata = await loop.run_in_executor(None, ingest_pdf, file_path)
         
         logger.info(f"Successfully processed: {file.filename}")
         
@@ -164,8 +192,9 @@ async def ask(data: QuestionRequest):
         
         logger.info(f"Question received: {data.question}")
         
-        # Get answer
-        result = ask_question(data.question)
+        # Get answer off the event loop — retrieval and the LLM call are blocking
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, ask_question, data.question)
         
         logger.info(f"Answer generated: {result.content[:100]}...")
         
@@ -199,7 +228,7 @@ async def get_pdfs():
             detail=f"Failed to list PDFs: {str(e)}"
         )
 
-@app.delete("/pdfs/{filename}")
+@app.delete("/pdfs/{filename}", response_model=DeleteResponse)
 async def delete_pdf_endpoint(filename: str):
     """
     Delete a PDF from the system
@@ -244,12 +273,28 @@ async def http_exception_handler(request, exc):
         content={"error": exc.detail}
     )
 
+# Full tracebacks are logged at most once per interval per exception class:
+# formatting a traceback is expensive, and a buggy or hostile client
+# triggering the same error in a loop shouldn't be able to flood the log
+_TRACEBACK_LOG_INTERVAL = 60.0  # seconds
+_TRACEBACK_LOG_MAX_CLASSES = 128
+_last_traceback_log = {}
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    exc_type = type(exc)
+    now = time.monotonic()
+    if now - _last_traceback_log.get(exc_type, float('-inf')) >= _TRACEBACK_LOG_INTERVAL:
+        if len(_last_traceback_log) >= _TRACEBACK_LOG_MAX_CLASSES:
+            _last_traceback_log.pop(next(iter(_last_traceback_log)))
+        _last_traceback_log[exc_type] = now
+        logger.error(f"Unhandled exception: {exc_type.__name__}", exc_info=True)
+    else:
+        logger.error(f"Unhandled exception: {exc_type.__name__} (traceback rate-limited)")
+    # Static body — exception details stay in the log, not the response
     return JSONResponse(
         status_code=500,
-        content={"error": "Internal server error", "detail": str(exc)}
+        content={"error": "Internal server error"}
     )
 
 # Mount frontend (optional - for serving UI from backend)
@@ -34,3 +34,10 @@ def cleanup_test_files():
     if os.path.exists(test_db):
         import shutil
         shutil.rmtree(test_db)
+    # Reset caches so tests don't leak cached answers into each other
+    import rag
+    rag._answer_cached.cache_clear()
+    rag._query_cache = None
+    rag._embedder = None
+    rag._db = None
+    rag._embedding_count = None
@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+import os
 import sys
 from pathlib import Path
 
@@ -63,6 +64,14 @@ class TestAPI:
         response = client.post("/upload-pdf", files=files)
         assert response.status_code == 400
         assert "empty" in response.json()["error"].lower()
+
+    def test_upload_pdf_with_invalid_content(self):
+        """Test uploading a .pdf file whose content is not a PDF"""
+        files = {"file": ("fake.pdf", b"definitely not a pdf", "application/pdf")}
+        response = client.post("/upload-pdf", files=files)
+        assert response.status_code == 400
+        assert "valid pdf" in response.json()["error"].lower()
+        assert not os.path.exists("uploads/fake.pdf")
     
     def test_delete_nonexistent_pdf(self):
         """Test deleting non-existent PDF"""
@@ -1,7 +1,9 @@
 import pytest
+import glob
 import os
 import json
 import sys
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
@@ -34,8 +36,8 @@ class TestRAGFunctions:
         assert loaded["test.pdf"]["num_chunks"] == 10
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)
     
     def test_add_pdf_metadata(self):
         """Test adding PDF metadata"""
@@ -53,8 +55,8 @@ class TestRAGFunctions:
         assert "test.pdf" in loaded
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)
     
     def test_delete_pdf_metadata(self):
         """Test deleting PDF metadata"""
@@ -76,8 +78,8 @@ class TestRAGFunctions:
         assert success == False
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)
     
     def test_get_all_pdfs(self):
         """Test getting all PDFs"""
@@ -93,8 +95,8 @@ class TestRAGFunctions:
         assert any(pdf["filename"] == "test2.pdf" for pdf in pdfs)
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)
     
     @patch('rag.Chroma')
     @patch('rag.OpenAIEmbeddings')
@@ -141,7 +143,7 @@ class TestRAGFunctions:
         
         # Mock Chroma instance
         mock_chroma_instance = Mock()
-        mock_chroma_instance.similarity_search.return_value = [mock_doc]
+        mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.return_value = [(mock_doc, 0.9)]
         mock_chroma_class.return_value = mock_chroma_instance
         
         # Mock model response
@@ -163,6 +165,137 @@ class TestRAGFunctions:
                 import shutil
                 shutil.rmtree("chroma_db")
 
+    @patch('rag.model')
+    @patch('rag.Chroma')
+    @patch('rag.OpenAIEmbeddings')
+    def test_semantic_cache_hit_returns_stored_answer(self, mock_embeddings, mock_chroma_class, mock_model):
+        """Test that a close-enough cached question answers without the LLM"""
+        from rag import ask_question
+        import rag
+
+        cache_doc = Mock()
+        cache_doc.metadata = {
+            "answer": "Cached answer",
+            "cached_at": time.time(),
+            "db_version": rag._db_version
+        }
+
+        mock_chroma_instance = Mock()
+        mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.return_value = [(cache_doc, 0.99)]
+        mock_chroma_class.return_value = mock_chroma_instance
+
+        os.makedirs("chroma_db", exist_ok=True)
+
+        try:
+            result = ask_question("How do I set up the VPN?")
+
+            assert result.content == "Cached answer"
+            assert not mock_model.invoke.called
+            # The probe must be scoped to the current corpus version
+            _, kwargs = mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.call_args
+            assert kwargs.get("filter") == {"db_version": rag._db_version}
+        finally:
+            if os.path.exists("chroma_db"):
+                import shutil
+                shutil.rmtree("chroma_db")
+
+    @patch('rag.model')
+    @patch('rag.Chroma')
+    @patch('rag.OpenAIEmbeddings')
+    def test_semantic_cache_expired_entry_is_miss(self, mock_embeddings, mock_chroma_class, mock_model):
+        """Test that an entry older than the TTL is dropped and recomputed"""
+        from rag import ask_question
+        import rag
+
+        cache_doc = Mock()
+        cache_doc.page_content = "This is test content"
+        cache_doc.metadata = {
+            "answer": "Stale answer",
+            "cached_at": time.time() - rag.SEMANTIC_CACHE_TTL - 1,
+            "db_version": rag._db_version
+        }
+
+        mock_chroma_instance = Mock()
+        mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.return_value = [(cache_doc, 0.99)]
+        mock_chroma_class.return_value = mock_chroma_instance
+
+        mock_response = Mock()
+        mock_response.content = "Fresh answer"
+        mock_model.invoke.return_value = mock_response
+
+        os.makedirs("chroma_db", exist_ok=True)
+
+        try:
+            result = ask_question("How do I set up the VPN?")
+
+            assert mock_model.invoke.called
+            assert result.content == "Fresh answer"
+            # The expired row was deleted from the cache collection
+            assert mock_chroma_instance._collection.delete.called
+        finally:
+            if os.path.exists("chroma_db"):
+                import shutil
+                shutil.rmtree("chroma_db")
+
+    @patch('rag.model')
+    @patch('rag.Chroma')
+    @patch('rag.OpenAIEmbeddings')
+    def test_ask_question_low_relevance_skips_llm(self, mock_embeddings, mock_chroma_class, mock_model):
+        """Test that low-relevance retrieval answers without invoking the LLM"""
+        from rag import ask_question
+
+        mock_doc = Mock()
+        mock_doc.page_content = "Unrelated content"
+        mock_doc.metadata = {"source_file": "test.pdf"}
+
+        mock_chroma_instance = Mock()
+        mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.return_value = [(mock_doc, 0.05)]
+        mock_chroma_class.return_value = mock_chroma_instance
+
+        os.makedirs("chroma_db", exist_ok=True)
+
+        try:
+            result = ask_question("Something completely off-topic?")
+            assert not mock_model.invoke.called
+            assert "No relevant information" in result.content
+        finally:
+            if os.path.exists("chroma_db"):
+                import shutil
+                shutil.rmtree("chroma_db")
+
+    @patch('rag.model')
+    @patch('rag.Chroma')
+    @patch('rag.OpenAIEmbeddings')
+    def test_ask_question_repeat_uses_cache(self, mock_embeddings, mock_chroma_class, mock_model):
+        """Test that repeating the same question skips retrieval and the LLM"""
+        from rag import ask_question
+
+        mock_doc = Mock()
+        mock_doc.page_content = "This is test content"
+        mock_doc.metadata = {"source_file": "test.pdf"}
+
+        mock_chroma_instance = Mock()
+        mock_chroma_instance.similarity_search_by_vector_with_relevance_scores.return_value = [(mock_doc, 0.9)]
+        mock_chroma_class.return_value = mock_chroma_instance
+
+        mock_response = Mock()
+        mock_response.content = "This is a test answer"
+        mock_model.invoke.return_value = mock_response
+
+        os.makedirs("chroma_db", exist_ok=True)
+
+        try:
+            first = ask_question("What is this?")
+            # Same question, different surface form -> cache hit
+            second = ask_question("  WHAT IS THIS?  ")
+
+            assert mock_model.invoke.call_count == 1
+            assert first.content == second.content == "This is a test answer"
+        finally:
+            if os.path.exists("chroma_db"):
+                import shutil
+                shutil.rmtree("chroma_db")
+
 class TestUtilityFunctions:
     """Test utility functions"""
     
@@ -177,8 +310,8 @@ class TestUtilityFunctions:
         assert isinstance(pdfs, list)
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)
     
     def test_delete_pdf(self):
         """Test delete PDF function"""
@@ -190,5 +323,5 @@ class TestUtilityFunctions:
         assert success == True
         
         # Cleanup
-        if os.path.exists("pdf_metadata.json"):
-            os.remove("pdf_metadata.json")
+        for f in glob.glob("pdf_metadata.sqlite*"):
+            os.remove(f)